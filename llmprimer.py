@@ -2,16 +2,47 @@
 
 import os
 import json
-import inquirer
-import pathspec
+import subprocess
+import codecs
+import functools
+import shutil
+import mmap
+import itertools
+from collections import deque
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# Imported once here; the __main__ block offers to install them if missing.
+try:
+    import inquirer
+    import pathspec
+except ImportError:
+    inquirer = pathspec = None
+
+try:
+    import orjson  # Optional, faster JSON parsing
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
 # --- Configuration ---
 CONTEXT_DIR_NAME = ".LLMContext"
 DUMP_FILE_NAME = "repository_dump.txt"
 LOCAL_CONFIG_NAME = "config.json"
 GLOBAL_CONFIG_NAME = "config.json"
 DEFAULT_EXCLUDED_DIRS = {'.git', '.idea', '__pycache__', 'node_modules', '.venv', 'venv'}
+EXCLUDED_DIRS = frozenset(DEFAULT_EXCLUDED_DIRS | {CONTEXT_DIR_NAME})
+READ_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+READ_AHEAD = READ_WORKERS * 4  # Max. number of files read ahead of the writer
+OUTPUT_BUFFER_SIZE = 1 << 20  # 1 MiB, amortizes write syscalls for many small files
+DEFAULT_MAX_FILE_BYTES = 1 << 20  # Files larger than this are skipped (config: 'max_file_bytes')
+BINARY_SNIFF_BYTES = 512  # Leading bytes inspected to detect binary files
+STREAM_THRESHOLD = 256 << 10  # Files this large are streamed into the dump instead of prefetched
+STREAM_CHUNK_SIZE = 1 << 20
+
+class BinaryFileError(Exception):
+    """Raised for files that look binary and are therefore left out of the dump."""
 
 def find_script_directory():
     """Finds the directory where the script is located."""
@@ -27,12 +58,10 @@ def load_config(cwd, script_dir):
 
     if local_config_path.exists():
         print(f"Found local configuration at: {local_config_path}")
-        with open(local_config_path, 'r', encoding='utf-8') as f:
-            return json.load(f), False
+        return _loads(local_config_path.read_bytes()), False
     elif global_config_path.exists():
         print(f"Using global configuration from: {global_config_path}")
-        with open(global_config_path, 'r', encoding='utf-8') as f:
-            return json.load(f), True
+        return _loads(global_config_path.read_bytes()), True
     else:
         print(f"Error: No local or global '{GLOBAL_CONFIG_NAME}' found.")
         print(f"Please create a '{GLOBAL_CONFIG_NAME}' file in the script's directory: {script_dir}")
@@ -57,42 +86,325 @@ def select_language_config(full_config):
     answers = inquirer.prompt(questions)
     return answers['language'] if answers else None
 
-def get_gitignore_spec(cwd):
+def get_gitignore_spec(gitignore_path):
     """
-    Finds the .gitignore file in the CWD and returns a PathSpec object.
+    Compiles the given .gitignore file and returns a PathSpec object, or None
+    if it cannot be read.
+    Uses GitIgnoreSpec where available (pathspec >= 0.10), which follows Git's
+    own precedence rules; older pathspec versions fall back to a PathSpec.
     """
-    gitignore_path = cwd / '.gitignore'
-    if gitignore_path.exists():
-        print(f"Found .gitignore at: {gitignore_path}")
+    print(f"Found .gitignore at: {gitignore_path}")
+    try:
         with open(gitignore_path, 'r', encoding='utf-8') as f:
+            if hasattr(pathspec, 'GitIgnoreSpec'):
+                return pathspec.GitIgnoreSpec.from_lines(f)
             return pathspec.PathSpec.from_lines('gitwildmatch', f)
-    print("No .gitignore found in the current directory.")
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"    - Could not read {gitignore_path}: {e}")
+        return None
+
+def gitignore_checker(spec):
+    """
+    Returns a function mapping a path to True (ignored), False (re-included
+    by a '!' pattern) or None (no pattern matches) for the given spec.
+    pathspec < 0.12 has no check_file, so negations cannot be told apart
+    from non-matches there.
+    """
+    if hasattr(spec, 'check_file'):
+        return lambda path: spec.check_file(path).include
+    return lambda path: True if spec.match_file(path) else None
+
+def is_oversized(relative_path, size, max_file_bytes):
+    """Checks a file's size against the configured cap and reports skipped files."""
+    if max_file_bytes and size > max_file_bytes:
+        print(f"  - Skipped (oversized, {size} bytes): {relative_path}")
+        return True
+    return False
+
+def _try_git_ls_files(cwd, target_extensions, max_file_bytes, tracked_only=False):
+    """
+    Lists the repository files via `git ls-files`, which already applies all
+    .gitignore rules without walking ignored directories. With tracked_only,
+    untracked files are left out, so git only reads its index and never scans
+    the working tree.
+    Returns a list of (relative POSIX path string, size) tuples, or None if
+    the CWD is not a git repository.
+    """
+    command = ["git", "-C", str(cwd), "ls-files", "-z", "--cached"]
+    if not tracked_only:
+        command += ["--others", "--exclude-standard"]
+    try:
+        result = subprocess.run(command, capture_output=True)
+    except OSError:  # git is not installed
+        return None
+    if result.returncode != 0:
+        return None
+
+    print("Using 'git ls-files' to collect repository files.")
+    files = []
+    # Whether a directory lies inside an excluded one, memoized per parent
+    # directory so sibling files don't repeat the check.
+    dir_excluded = {}
+    # Unmerged paths are listed once per conflict stage; keep the first only.
+    for raw_path in dict.fromkeys(result.stdout.split(b'\x00')):
+        path = os.fsdecode(raw_path)
+        if not path.endswith(target_extensions):
+            continue
+        # git always prints '/'-separated paths relative to the CWD
+        parent = path.rpartition('/')[0]
+        excluded = dir_excluded.get(parent)
+        if excluded is None:
+            excluded = dir_excluded[parent] = bool(parent and EXCLUDED_DIRS.intersection(parent.split('/')))
+        if excluded:
+            continue
+        try:
+            size = os.stat(os.path.join(cwd, path)).st_size
+        except FileNotFoundError:  # Deleted from the working tree but still tracked
+            continue
+        except OSError:  # e.g. no permission; reported when reading
+            size = 0
+        if is_oversized(path, size, max_file_bytes):
+            continue
+        files.append((path, size))
+    return files
+
+def walk_directory(cwd, target_extensions, max_file_bytes):
+    """
+    Walks the CWD and collects files matching the target extensions,
+    skipping excluded directories, anything ignored by a .gitignore file
+    and files larger than max_file_bytes.
+    Returns a list of (relative POSIX path string, size) tuples.
+    """
+    files = []
+    # Each stack entry holds a directory's absolute path, its cwd-relative
+    # POSIX prefix and the gitignore specs that apply to it. Like git, every
+    # directory's .gitignore is read as the walk reaches it and only applies to
+    # that subtree; specs are (base prefix, checker) pairs, outermost first.
+    stack = [(str(cwd), "", ())]
+    while stack:
+        dir_path, rel_prefix, specs = stack.pop()
+        try:
+            with os.scandir(dir_path) as it:
+                entries = list(it)
+        except OSError:  # Unreadable directory; os.walk skipped these silently too
+            continue
+
+        for entry in entries:
+            if entry.name == '.gitignore' and entry.is_file():
+                spec = get_gitignore_spec(entry.path)
+                if spec:
+                    specs = specs + ((rel_prefix, gitignore_checker(spec)),)
+                break
+
+        def is_ignored(rel_path):
+            # Patterns are relative to the directory holding the .gitignore.
+            # As in git, deeper files take precedence: the innermost spec
+            # with a matching pattern (ignore or '!' negation) decides.
+            ignored = False
+            for base, check in specs:
+                include = check(rel_path[len(base):])
+                if include is not None:
+                    ignored = include
+            return ignored
+
+        for entry in entries:
+            name = entry.name
+            if entry.is_dir():
+                # Like os.walk, symlinked directories are not followed.
+                if entry.is_symlink() or name in EXCLUDED_DIRS:
+                    continue
+                # Prune ignored directories before descending. The trailing
+                # '/' makes directory-only patterns (e.g. 'build/') match.
+                rel_dir = rel_prefix + name + '/'
+                if specs and is_ignored(rel_dir):
+                    continue
+                stack.append((entry.path, rel_dir, specs))
+            else:
+                if not name.endswith(target_extensions):
+                    continue
+                rel_path = rel_prefix + name
+                if specs and is_ignored(rel_path):
+                    continue
+                try:
+                    size = entry.stat().st_size
+                except OSError:  # e.g. a broken symlink; reported when reading
+                    size = 0
+                if is_oversized(rel_path, size, max_file_bytes):
+                    continue
+                files.append((rel_path, size))
+    return files
+
+def _common_depth(a, b):
+    """Returns the number of leading directories two split paths share."""
+    limit = min(len(a), len(b)) - 1
+    depth = 0
+    while depth < limit and a[depth] == b[depth]:
+        depth += 1
+    return depth
+
+def write_file_tree(file_paths, outfile):
+    """
+    Writes a file tree of the given '/'-separated paths to outfile (binary),
+    one line at a time instead of building the whole tree as a string.
+    """
+    # Sort into tree order: within a directory files come before subdirectories
+    # ('' sorts before any name), then by name. Each directory's entries then
+    # form one contiguous run and the tree can be emitted from the flat list.
+    paths = sorted(
+        (path.split('/') for path in file_paths),
+        key=lambda parts: parts[:-1] + ['', parts[-1]],
+    )
+    # starts[i]: depth of the first node that paths[i] adds to the tree,
+    # i.e. the number of directories it shares with the previous path.
+    starts = [0]
+    starts.extend(_common_depth(a, b) for a, b in zip(paths, paths[1:]))
+
+    # Backward pass: for the nodes each path adds, record whether a later
+    # sibling follows ('├──') or not ('└──').
+    runs = [None] * len(paths)
+    has_sibling = []
+    for i in range(len(paths) - 1, -1, -1):
+        if i + 1 < len(paths):
+            # paths[i + 1] leaves every node of paths[i] below this depth
+            # and is a later sibling of the node at this depth.
+            del has_sibling[starts[i + 1]:]
+            has_sibling.append(True)
+        has_sibling.extend([False] * (len(paths[i]) - len(has_sibling)))
+        runs[i] = has_sibling[starts[i]:]
+
+    # Forward pass: write the new nodes of each path, keeping only the
+    # per-depth line prefixes of the current path.
+    write = outfile.write
+    prefixes = [""]
+    for parts, start, siblings in zip(paths, starts, runs):
+        del prefixes[start + 1:]
+        for depth, name in enumerate(parts[start:], start):
+            prefix = prefixes[depth]
+            if siblings[depth - start]:
+                write(f"{prefix}├── {name}\n".encode('utf-8'))
+                prefixes.append(prefix + "│   ")
+            else:
+                write(f"{prefix}└── {name}\n".encode('utf-8'))
+                prefixes.append(prefix + "    ")
+
+def looks_binary(head):
+    """
+    Guesses whether a file is binary from its leading bytes: NUL bytes or
+    invalid UTF-8 (a multi-byte sequence cut off at the end is tolerated).
+    """
+    if b'\x00' in head:
+        return True
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(head, final=False)
+    except UnicodeDecodeError:
+        return True
+    return False
+
+def read_file_content(full_path, size, skip_binary=True):
+    """
+    Reads a file to be added to the context.
+    Returns a (content, error) tuple so failures don't abort the whole run.
+    Files that look binary yield a BinaryFileError when skip_binary is set.
+    """
+    # Plain os.open/os.read: no buffered reader object per file, and with the
+    # size known up front a single read usually returns the whole file.
+    flags = os.O_RDONLY | getattr(os, 'O_BINARY', 0) | getattr(os, 'O_CLOEXEC', 0)
+    try:
+        fd = os.open(full_path, flags)
+        try:
+            chunks = []
+            want = size + 1  # One byte more than expected, so a short read means EOF
+            while True:
+                chunk = os.read(fd, want)
+                chunks.append(chunk)
+                if len(chunk) < want:
+                    break
+                want = STREAM_CHUNK_SIZE  # The file grew since it was listed
+        finally:
+            os.close(fd)
+        content = chunks[0] if len(chunks) == 1 else b"".join(chunks)
+        if skip_binary and looks_binary(content[:BINARY_SNIFF_BYTES]):
+            raise BinaryFileError("file looks binary")
+        return content, None
+    except Exception as e:
+        return None, e
+
+def copy_file_body(infile, outfile):
+    """
+    Copies the rest of infile to outfile without an intermediate bytes copy.
+    Uses os.sendfile where the platform allows it (kernel-to-kernel, e.g.
+    Linux), otherwise writes from an mmap of the file (e.g. macOS), and falls
+    back to shutil.copyfileobj if the file cannot be mapped.
+    """
+    outfile.flush()  # sendfile writes to the descriptor directly, bypassing the buffer
+    offset = infile.tell()
+    try:
+        while True:
+            sent = os.sendfile(outfile.fileno(), infile.fileno(), offset, STREAM_CHUNK_SIZE)
+            if not sent:
+                return
+            offset += sent
+    except (AttributeError, OSError):  # No sendfile, or not for regular files (macOS)
+        pass
+    try:
+        with mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm)[offset:] as rest:
+                outfile.write(rest)
+        return
+    except (ValueError, OSError):  # e.g. the file is empty or cannot be mapped
+        pass
+    infile.seek(offset)
+    shutil.copyfileobj(infile, outfile, STREAM_CHUNK_SIZE)
+
+def stream_file_content(full_path, outfile, header, skip_binary=True):
+    """
+    Writes header and the file's content to outfile without loading the whole
+    file into memory. Returns None on success, or the error that kept the
+    source file from being read. Errors writing outfile propagate.
+    """
+    try:
+        infile = open(full_path, 'rb')
+    except OSError as e:
+        return e
+    with infile:
+        try:
+            head = infile.read(BINARY_SNIFF_BYTES)
+        except OSError as e:
+            return e
+        if skip_binary and looks_binary(head):
+            return BinaryFileError("file looks binary")
+        outfile.write(header)
+        outfile.write(head)
+        copy_file_body(infile, outfile)
     return None
 
-def generate_file_tree(file_paths):
-    """Generates a string representation of a file tree."""
-    tree = {}
-    for path in file_paths:
-        parts = path.parts
-        current_level = tree
-        for part in parts:
-            if part not in current_level:
-                current_level[part] = {}
-            current_level = current_level[part]
-
-    tree_lines = []
-    def build_tree_lines(d, prefix=""):
-        # Sort items to ensure consistent order (files before dirs)
-        items = sorted(d.keys(), key=lambda k: (len(d[k]) > 0, k))
-        for i, name in enumerate(items):
-            connector = "├── " if i < len(items) - 1 else "└── "
-            tree_lines.append(f"{prefix}{connector}{name}")
-            if d[name]:  # It's a directory
-                extension = "│   " if i < len(items) - 1 else "    "
-                build_tree_lines(d[name], prefix + extension)
-
-    build_tree_lines(tree)
-    return "\n".join(tree_lines)
+def read_files_in_order(cwd, files, skip_binary=True):
+    """
+    Yields (relative_path, content, error) for each (relative_path, size) in
+    the given order, while a thread pool reads up to READ_AHEAD files ahead of
+    the consumer. Files of at least STREAM_THRESHOLD bytes are not read here;
+    they are yielded with content None for the consumer to stream.
+    """
+    read = functools.partial(read_file_content, skip_binary=skip_binary)
+
+    def submit(executor, relative_path, size):
+        if size >= STREAM_THRESHOLD:
+            return relative_path, None
+        return relative_path, executor.submit(read, os.path.join(cwd, relative_path), size)
+
+    files = iter(files)
+    with ThreadPoolExecutor(max_workers=READ_WORKERS) as executor:
+        pending = deque(submit(executor, *item) for item in itertools.islice(files, READ_AHEAD))
+        while pending:
+            relative_path, future = pending.popleft()
+            next_item = next(files, None)
+            if next_item is not None:
+                pending.append(submit(executor, *next_item))
+            if future is None:
+                yield relative_path, None, None
+            else:
+                content, error = future.result()
+                yield relative_path, content, error
 
 def main():
     """Main function to run the context building process."""
@@ -123,30 +435,22 @@ def main():
         print("Error: The selected configuration has no 'extensions' defined.")
         return
 
-    target_extensions = set(language_config['extensions'])
-    gitignore_spec = get_gitignore_spec(cwd)
+    # A tuple lets str.endswith test all extensions in one C-level call. This
+    # also matches extension-less entries such as 'Makefile' by name.
+    target_extensions = tuple(set(language_config['extensions']))
+    max_file_bytes = language_config.get('max_file_bytes', DEFAULT_MAX_FILE_BYTES)
+    skip_binary = language_config.get('skip_binary', True)
+    tracked_only = language_config.get('tracked_only', False)
     output_file_path = context_dir / DUMP_FILE_NAME
 
     # --- 1. First Pass: Collect all files to be included ---
     print("\nScanning for relevant files...")
-    files_to_include = []
-    for root, dirs, files in os.walk(cwd, topdown=True):
-        current_root_path = Path(root)
-        
-        excluded_dirs = DEFAULT_EXCLUDED_DIRS.union({CONTEXT_DIR_NAME})
-        dirs[:] = [d for d in dirs if d not in excluded_dirs]
-        
-        if gitignore_spec:
-            dirs[:] = [d for d in dirs if not gitignore_spec.match_file(str(current_root_path / d) + '/')]
+    files_to_include = _try_git_ls_files(cwd, target_extensions, max_file_bytes, tracked_only)
+    if files_to_include is None:
+        files_to_include = walk_directory(cwd, target_extensions, max_file_bytes)
 
-        for filename in files:
-            file_path = current_root_path / filename
-            if gitignore_spec and gitignore_spec.match_file(str(file_path)):
-                continue
-            if file_path.suffix in target_extensions:
-                files_to_include.append(file_path.relative_to(cwd))
-    
-    files_to_include.sort()
+    # Sort by path components (like pathlib did), so 'a/x' precedes 'a-b/x'
+    files_to_include.sort(key=lambda item: item[0].split('/'))
     
     if not files_to_include:
         print("No files found matching the criteria. Nothing to do.")
@@ -156,44 +460,49 @@ def main():
     print(f"Found {len(files_to_include)} files. Generating context file...")
     context_dir.mkdir(exist_ok=True)
     
-    with open(output_file_path, 'w', encoding='utf-8') as outfile:
+    # The dump is written in binary mode: file contents are copied as raw
+    # bytes, so there is no decode/encode round-trip per file.
+    with open(output_file_path, 'wb', buffering=OUTPUT_BUFFER_SIZE) as outfile:
         # Write the file tree header
-        outfile.write("Project Structure:\n\n")
-        tree_string = generate_file_tree(files_to_include)
-        outfile.write(tree_string)
-        outfile.write(f"\n\n{'='*80}\n\n")
+        outfile.write(b"Project Structure:\n\n")
+        write_file_tree([path for path, _ in files_to_include], outfile)
+        outfile.write(f"\n{'='*80}\n\n".encode('utf-8'))
 
-        # Write the content of each file
-        for relative_path in files_to_include:
-            print(f"  Adding: {relative_path}")
-            full_path = cwd / relative_path
-            try:
-                with open(full_path, 'r', encoding='utf-8', errors='ignore') as infile:
-                    content = infile.read()
-                    posix_path = str(relative_path).replace("\\", "/")
-                    outfile.write(f"--- File: {posix_path} ---\n\n")
+        # Write the content of each file. Reads are prefetched on worker
+        # threads; writing stays on this thread to keep the output ordered.
+        # Binary files are only detected here, after the tree was written, so
+        # they still appear in the tree but get no content section.
+        added_count = 0
+        for relative_path, content, error in read_files_in_order(cwd, files_to_include, skip_binary):
+            header = f"--- File: {relative_path} ---\n\n".encode('utf-8')
+            if error is None:
+                if content is None:  # Large file, streamed instead of prefetched
+                    error = stream_file_content(os.path.join(cwd, relative_path), outfile, header, skip_binary)
+                else:
+                    outfile.write(header)
                     outfile.write(content)
-                    outfile.write("\n\n")
-            except Exception as e:
-                print(f"    - Could not read file {relative_path}: {e}")
+            if isinstance(error, BinaryFileError):
+                print(f"  - Skipped (binary): {relative_path}")
+                continue
+            if error is not None:
+                print(f"  - Could not read file {relative_path}: {error}")
+                continue
+            print(f"  Adding: {relative_path}")
+            outfile.write(b"\n\n")
+            added_count += 1
 
     print("-" * 50)
     print(f"Processing complete.")
-    print(f"Total files added to context: {len(files_to_include)}")
+    print(f"Total files added to context: {added_count}")
     print(f"Repository dump created at: {output_file_path}")
     print("-" * 50)
 
 if __name__ == '__main__':
     try:
-        try:
-            import inquirer
-            import pathspec
-        except ImportError:
+        if inquirer is None or pathspec is None:
             print("One or more required packages are not installed.")
             response = input("Do you want to install 'inquirer' and 'pathspec'? (y/n): ")
             if response.lower() == 'y':
-                import subprocess
-                import sys
                 subprocess.check_call([sys.executable, "-m", "pip", "install", "inquirer", "pathspec"])
                 print("Packages installed successfully. Please run the script again.")
             else: